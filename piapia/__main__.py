@@ -1,12 +1,14 @@
 # piapia/__main__.py
 
+import asyncio
 import logging
+import sys
 import warnings
 
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pydub")
 
-from piapia.config.settings import Settings
-from piapia.config.logging_config import configure_logging
+from piapia.config.settings import get_settings
+from piapia.config.logging_config import configure_logging, stop_logging
 from piapia.utils.commandline import parse_args
 from piapia.bot.piapia_bot import PiaPiaBot
 from piapia.bot.cogs.audio_cog import AudioCog
@@ -15,13 +17,27 @@ from piapia.bot.cogs.admin_cog import AdminCog
 logger = logging.getLogger(__name__)
 
 
+def _install_uvloop() -> None:
+    """Use uvloop's libuv-based event loop when it is installed (not on Windows)."""
+    if sys.platform == "win32":
+        return
+    try:
+        import uvloop
+    except ImportError:
+        logger.debug("uvloop is not installed; using the default asyncio event loop.")
+        return
+
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    logger.info("Using the uvloop event loop.")
+
+
 def main() -> None:
     # ------------------------------------------------------------------ #
     # 1. CLI arguments & Settings
     # ------------------------------------------------------------------ #
     args = parse_args()
 
-    settings = Settings()
+    settings = get_settings()
     if args.debug:
         # Force debug mode from the CLI if requested
         settings.debug = True
@@ -35,6 +51,9 @@ def main() -> None:
     # ------------------------------------------------------------------ #
     # 3. Bot initialization and Cogs setup
     # ------------------------------------------------------------------ #
+    # Must run before the bot is created: py-cord grabs its loop in __init__
+    _install_uvloop()
+
     bot = PiaPiaBot(settings)
     bot.add_cog(AudioCog(bot))
     bot.add_cog(AdminCog(bot))
@@ -42,9 +61,13 @@ def main() -> None:
     # ------------------------------------------------------------------ #
     # 4. Run
     # ------------------------------------------------------------------ #
-    bot.run(settings.discord_token)
-    
-    logger.info("Pia-Pia is back on its perch. 🦜")
+    try:
+        bot.run(settings.discord_token)
+
+        logger.info("Pia-Pia is back on its perch. 🦜")
+    finally:
+        # Flush records still queued for the logging listener thread
+        stop_logging()
 
 
 if __name__ == "__main__":
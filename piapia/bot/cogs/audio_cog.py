@@ -40,6 +40,7 @@ class AudioCog(commands.Cog):
             )
             return
 
+        guild_id = ctx.guild_id
         author_vc = ctx.author.voice
         if not author_vc:
             await ctx.respond(
@@ -49,7 +50,7 @@ class AudioCog(commands.Cog):
             return
 
         # Already connected?
-        if self.bot.guild_to_helper.get(ctx.guild_id) is not None:
+        if self.bot.guild_to_helper.get(guild_id) is not None:
             await ctx.respond(
                 "I'm already in another tavern (another voice channel).",
                 ephemeral=True,
@@ -59,8 +60,6 @@ class AudioCog(commands.Cog):
         await ctx.trigger_typing()
 
         try:
-            guild_id = ctx.guild_id
-
             try:
                 vc = await author_vc.channel.connect(timeout=15, reconnect=True)
             except IndexError:
@@ -106,6 +105,7 @@ class AudioCog(commands.Cog):
     )
     @commands.cooldown(1, 5, commands.BucketType.guild)
     async def record(self, ctx: discord.ApplicationContext, label: Optional[str] = None) -> None:
+        guild_id = ctx.guild_id
         author_vc = ctx.author.voice
         connect_text = "/connect"
 
@@ -116,7 +116,7 @@ class AudioCog(commands.Cog):
             )
             return
 
-        helper = self.bot.guild_to_helper.get(ctx.guild_id)
+        helper = self.bot.guild_to_helper.get(guild_id)
         if not helper or not helper.vc:
             await ctx.respond(
                 f"I'm not in your tavern yet. Invite me with {connect_text}.",
@@ -124,7 +124,7 @@ class AudioCog(commands.Cog):
             )
             return
 
-        if self.bot.current_sink_by_guild.get(ctx.guild_id) is not None:
+        if self.bot.current_sink_by_guild.get(guild_id) is not None:
             await ctx.respond(
                 "A session is already active on this server. Finish it with /stop.",
                 ephemeral=True,
@@ -135,7 +135,8 @@ class AudioCog(commands.Cog):
 
         self.bot.start_record_session(ctx, label=label)
 
-        if self.bot.current_sink_by_guild.get(ctx.guild_id) is None:
+        session = self.bot.current_session_by_guild.get(guild_id)
+        if self.bot.current_sink_by_guild.get(guild_id) is None or session is None:
             await ctx.followup.send(
                 "I couldn't start recording 😢 (check the logs).",
                 ephemeral=True,
@@ -143,7 +144,7 @@ class AudioCog(commands.Cog):
             return
         
         await ctx.followup.send(
-            f"Recording started! 🎙️ Session: `{self.bot.current_session_by_guild[ctx.guild_id].session_id}`",
+            f"Recording started! 🎙️ Session: `{session.session_id}`",
             ephemeral=False,
         )
 
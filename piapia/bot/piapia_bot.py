@@ -1,25 +1,40 @@
 # piapia/bot/piapia_bot.py
 
 import asyncio
+import json
 import logging
 import os
-from copy import copy
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional, Set, Tuple
 
 import discord
 import yaml
 
 from piapia.bot.helper import BotHelper
+from piapia.config.logging_config import flush_logging
 from piapia.config.settings import Settings, SUPPORTED_AUDIO_FORMATS
 from piapia.domain.sessions import AudioSessionInfo, make_session_id
 from piapia.sinks.audio_archiver import AudioArchiver
 from piapia.sinks.discord_sink import DiscordSink
+from piapia.utils.atomic_write import atomic_write_text
 from piapia.utils.session_paths import apply_paths_to_session
 
 logger = logging.getLogger(__name__)
 
+# Legacy YAML player maps: pick the libyaml-backed loader once, at import time
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def _dump_player_map(path: Path, data: Dict[int, Dict[str, str]]) -> None:
+    """Write a guild player map to `path` as JSON, atomically.
+
+    The map is serialized in memory, written once to a temp file next to the
+    target, then renamed: a crash never leaves a truncated map.
+    """
+    atomic_write_text(path, json.dumps(data, ensure_ascii=False, indent=2))
+
 
 class PiaPiaBot(discord.Bot):
     """Pia-Pia Discord bot.
@@ -34,7 +49,7 @@ class PiaPiaBot(discord.Bot):
     - Start/stop a single active recording session per guild.
     - Create and persist session metadata (`session_meta.json`) through `AudioSessionInfo`.
     - Record per-user audio through `DiscordSink` and optionally archive it via `AudioArchiver`.
-    - Load and persist per-guild player mappings (YAML) to label tracks/metadata.
+    - Load and persist per-guild player mappings (JSON) to label tracks/metadata.
     - Enforce an optional maximum session duration with an async timer (warning + auto-stop).
 
     Per-guild state model
@@ -66,6 +81,9 @@ class PiaPiaBot(discord.Bot):
     session metadata and clean all active sinks before closing the Discord connection.
     """
 
+    # Debounce window (seconds) for player map saves
+    PLAYER_MAP_FLUSH_DELAY: float = 0.5
+
     def __init__(self, settings: Settings) -> None:
         self.settings = settings
 
@@ -93,6 +111,17 @@ class PiaPiaBot(discord.Bot):
         # Max session duration timers (guild_id -> asyncio.Task)
         self._session_timers: Dict[int, asyncio.Task] = {}
 
+        # Debounced player map saves (guilds with unsaved changes + pending flush)
+        self._player_map_dirty: Set[int] = set()
+        self._player_map_flush_task: Optional[asyncio.Task] = None
+        self._player_map_dir_ready: bool = False
+
+        # Session finalization (WAV close + conversion) runs on its own small
+        # pool so long conversions never starve the default executor
+        self._finalize_executor = ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix="finalize"
+        )
+
         # Audio format validation
         fmt = self.settings.audio_format.lower().strip()
         if fmt not in SUPPORTED_AUDIO_FORMATS:
@@ -101,6 +130,17 @@ class PiaPiaBot(discord.Bot):
                 f"Accepted formats: {', '.join(sorted(SUPPORTED_AUDIO_FORMATS))}"
             )
 
+        # Settings read on the session paths, frozen as plain attributes
+        self._audio_format: str = fmt
+        self._player_map_dir: Optional[str] = self.settings.player_map_dir
+        self._max_session_minutes: int = self.settings.max_session_duration_minutes
+
+        # Audio sessions root, resolved and created once (not on every /record)
+        self._audio_sessions_dir = os.path.join(
+            self.settings.logs_dir, self.settings.audio_sessions_subdir
+        )
+        os.makedirs(self._audio_sessions_dir, exist_ok=True)
+
         # Load player maps from disk (if configured)
         self._load_player_maps()
 
@@ -115,33 +155,57 @@ class PiaPiaBot(discord.Bot):
     # Player map
     # ------------------------------------------------------------------ #
     def _load_player_maps(self) -> None:
-        """Load player maps from the YAML folder defined in settings.player_map_dir."""
-        player_map_dir = self.settings.player_map_dir
+        """Load player maps from the JSON folder defined in settings.player_map_dir.
+
+        Legacy `guild_<id>.yaml` / `.yml` files are still read as a one-shot
+        migration fallback when no JSON file exists for that guild; the next
+        `/update_player_map` rewrites them as JSON.
+        """
+        player_map_dir = self._player_map_dir
         if not player_map_dir:
             logger.info("PLAYER_MAP_DIR is not set; player maps start empty.")
             return
 
-        dir_path = Path(player_map_dir)
-        if not dir_path.is_dir():
+        # One directory scan; a missing folder is detected by the scan itself
+        try:
+            with os.scandir(player_map_dir) as it:
+                names = [entry.name for entry in it if entry.name.startswith("guild_")]
+        except (FileNotFoundError, NotADirectoryError):
             logger.info(
                 "PLAYER_MAP_DIR=%s not found; player maps start empty.",
                 player_map_dir,
             )
             return
 
+        dir_path = Path(player_map_dir)
+        self._player_map_dir_ready = True
+
+        # JSON first, then legacy YAML for guilds that have not been migrated yet
+        files = sorted(dir_path / name for name in names if name.endswith(".json"))
+        files += sorted(
+            dir_path / name for name in names if name.endswith((".yaml", ".yml"))
+        )
+
         total = 0
-        for file in dir_path.glob("guild_*.yaml"):
+        for file in files:
             try:
                 guild_id = int(file.stem.split("_", 1)[1])
             except (IndexError, ValueError):
                 logger.warning("Ignoring player_map filename (invalid format): %s", file.name)
                 continue
 
+            if guild_id in self.player_map:
+                # Already loaded from its JSON file: the legacy YAML is stale
+                continue
+
             try:
-                data = yaml.safe_load(file.read_text(encoding="utf-8")) or {}
+                if file.suffix == ".json":
+                    data = json.loads(file.read_text(encoding="utf-8")) or {}
+                else:
+                    data = yaml.load(file.read_text(encoding="utf-8"), Loader=_YAML_LOADER) or {}
                 if not isinstance(data, dict):
                     logger.warning(
-                        "YAML file %s does not contain a dict: %s",
+                        "Player map file %s does not contain a dict: %s",
                         file,
                         type(data),
                     )
@@ -179,15 +243,25 @@ class PiaPiaBot(discord.Bot):
             total,
         )
 
-    async def update_player_map(self, ctx: Any) -> None:
-        """Update the guild player_map and persist it to YAML if configured."""
-        guild_id = ctx.guild_id
+    @staticmethod
+    def _compute_player_map(guild: Any) -> Dict[int, Dict[str, str]]:
+        """Build user_id -> {player, character} from the guild members."""
         guild_map: Dict[int, Dict[str, str]] = {}
-        for member in ctx.guild.members:
+        for member in guild.members:
             guild_map[member.id] = {
                 "player": member.name,
                 "character": member.display_name,
             }
+        return guild_map
+
+    async def update_player_map(self, ctx: Any) -> None:
+        """Update the guild player_map and schedule its JSON save if configured.
+
+        Saves are debounced: updates arriving within `PLAYER_MAP_FLUSH_DELAY`
+        seconds are coalesced into a single write per guild.
+        """
+        guild_id = ctx.guild_id
+        guild_map = self._compute_player_map(ctx.guild)
 
         logger.info(
             "Updating player_map for guild %s: %d members",
@@ -197,22 +271,54 @@ class PiaPiaBot(discord.Bot):
 
         self.player_map[guild_id] = guild_map
 
-        player_map_dir = self.settings.player_map_dir
-        if player_map_dir:
+        if not self._player_map_dir:
+            return
+
+        self._player_map_dirty.add(guild_id)
+        task = self._player_map_flush_task
+        if task is None or task.done():
+            self._player_map_flush_task = asyncio.create_task(
+                self._delayed_player_map_flush(self.PLAYER_MAP_FLUSH_DELAY)
+            )
+
+    async def _delayed_player_map_flush(self, delay: float) -> None:
+        """Wait for the debounce window to close, then save dirty maps."""
+        await asyncio.sleep(delay)
+        await self._flush_player_maps()
+
+    async def _flush_player_maps(self) -> None:
+        """Persist every dirty guild player map (one atomic file per guild)."""
+        player_map_dir = self._player_map_dir
+        if not player_map_dir:
+            self._player_map_dirty.clear()
+            return
+
+        while self._player_map_dirty:
+            guild_id = self._player_map_dirty.pop()
+            guild_map = self.player_map.get(guild_id)
+            if guild_map is None:
+                continue
+
+            file_path = Path(player_map_dir) / f"guild_{guild_id}.json"
             try:
-                dir_path = Path(player_map_dir)
-                dir_path.mkdir(parents=True, exist_ok=True)
-
-                file_path = dir_path / f"guild_{guild_id}.yaml"
-                with open(file_path, "w", encoding="utf-8") as f:
-                    yaml.dump(
-                        guild_map,
-                        f,
-                        default_flow_style=False,
-                        allow_unicode=True,
+                # Create the folder once per process, not on every save
+                if not self._player_map_dir_ready:
+                    await asyncio.to_thread(
+                        file_path.parent.mkdir, parents=True, exist_ok=True
                     )
+                    self._player_map_dir_ready = True
+
+                # Blocking I/O: serialize a stable snapshot off the event loop
+                await asyncio.to_thread(_dump_player_map, file_path, dict(guild_map))
                 logger.info("Player map saved to %s", file_path)
+            except asyncio.CancelledError:
+                # Cancelled mid-save (shutdown): keep the guild dirty for close()
+                self._player_map_dirty.add(guild_id)
+                raise
             except Exception as e:
+                if isinstance(e, FileNotFoundError):
+                    # Folder removed while running: recreate it on the next save
+                    self._player_map_dir_ready = False
                 logger.error(
                     "Error saving player_map for guild %s : %s",
                     guild_id,
@@ -222,12 +328,13 @@ class PiaPiaBot(discord.Bot):
     # ------------------------------------------------------------------ #
     # Sink / session management
     # ------------------------------------------------------------------ #
-    def _finalize_session_meta_for_guild(self, guild_id: int) -> None:
-        """Set ended_at and save session_meta.json if a session exists."""
-        session = self.current_session_by_guild.get(guild_id)
-        if session is None:
-            return
+    async def _run_finalize(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run a blocking finalization step on the dedicated finalize pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._finalize_executor, func, *args)
 
+    def _finalize_session_meta(self, guild_id: int, session: AudioSessionInfo) -> None:
+        """Set ended_at and save session_meta.json."""
         if session.ended_at is None:
             session.ended_at = datetime.now(timezone.utc)
 
@@ -242,12 +349,49 @@ class PiaPiaBot(discord.Bot):
                 e,
             )
 
+    def _finalize_and_cleanup(
+        self,
+        guild_id: int,
+        session: Optional[AudioSessionInfo],
+        sink: Optional[DiscordSink],
+    ) -> None:
+        """Blocking end of a session, run on the finalize pool.
+
+        Meta is saved BEFORE the sink cleanup so the sink can merge its extras;
+        the cleanup then closes the WAVs and converts them.
+        """
+        if session is not None:
+            self._finalize_session_meta(guild_id, session)
+
+        if sink is not None:
+            logger.debug("Stopping DiscordSink for guild %s.", guild_id)
+            try:
+                sink.cleanup()
+            except Exception as e:
+                logger.error(
+                    "Error during sink cleanup for guild %s: %s",
+                    guild_id,
+                    e,
+                )
+
+        # Session over: push buffered log lines to disk
+        flush_logging()
+
+    def _detach_session(
+        self, guild_id: int
+    ) -> Tuple[Optional[AudioSessionInfo], Optional[DiscordSink]]:
+        """Remove a guild's session + sink from the live state (event loop only)."""
+        self._cancel_session_timer(guild_id)
+        session = self.current_session_by_guild.pop(guild_id, None)
+        sink = self.current_sink_by_guild.pop(guild_id, None)
+        return session, sink
+
     # ------------------------------------------------------------------ #
     # Max session duration timer
     # ------------------------------------------------------------------ #
     def _start_session_timer(self, guild_id: int, channel_id: int) -> None:
         """Start an async timer that will stop the session after the configured max duration."""
-        max_minutes = self.settings.max_session_duration_minutes
+        max_minutes = self._max_session_minutes
         if max_minutes <= 0:
             return
 
@@ -270,7 +414,7 @@ class PiaPiaBot(discord.Bot):
 
     async def _session_timeout_handler(self, guild_id: int, channel_id: int) -> None:
         """Timeout coroutine: warn 5 minutes before, then stop automatically."""
-        max_minutes = self.settings.max_session_duration_minutes
+        max_minutes = self._max_session_minutes
         warning_delay = 5  # minutes
 
         try:
@@ -328,32 +472,50 @@ class PiaPiaBot(discord.Bot):
             pass
 
     def _close_and_clean_sink_for_guild(self, guild_id: int) -> None:
-        """Stop and clean up the sink associated with a guild (best effort)."""
-        # 0) Cancel the max-duration timer
-        self._cancel_session_timer(guild_id)
+        """Stop and clean up the sink associated with a guild (best effort).
 
-        # 1) Finalize meta BEFORE cleanup so the sink can merge its extras.
-        try:
-            self._finalize_session_meta_for_guild(guild_id)
-        except Exception as e:
-            logger.error("Error while finalizing meta (guild %s): %s", guild_id, e)
+        State is detached right away; the blocking part (meta save, WAV close,
+        conversion) is handed to the finalize pool instead of running on the loop.
+        """
+        session, sink = self._detach_session(guild_id)
+        if session is None and sink is None:
+            return
 
-        # 2) Sink cleanup (close WAV + write extras)
-        sink = self.current_sink_by_guild.get(guild_id)
-        if sink:
-            logger.debug("Stopping DiscordSink for guild %s.", guild_id)
+        try:
+            future = self._finalize_executor.submit(
+                self._finalize_and_cleanup, guild_id, session, sink
+            )
+        except RuntimeError:
+            # Pool already shut down (bot closing): finish inline
             try:
-                sink.cleanup()
+                self._finalize_and_cleanup(guild_id, session, sink)
             except Exception as e:
                 logger.error(
-                    "Error during sink cleanup for guild %s: %s",
+                    "Error finalizing session for guild %s: %s",
                     guild_id,
                     e,
+                    exc_info=e,
                 )
+            return
 
-        # 3) State cleanup
-        self.current_sink_by_guild.pop(guild_id, None)
-        self.current_session_by_guild.pop(guild_id, None)
+        # Nobody awaits this future: surface its errors in the logs
+        future.add_done_callback(
+            lambda fut: self._log_finalize_error(guild_id, fut)
+        )
+
+    @staticmethod
+    def _log_finalize_error(guild_id: int, future: "Future[None]") -> None:
+        """Done-callback for background finalizations: log their exception, if any."""
+        if future.cancelled():
+            return
+        exc = future.exception()
+        if exc is not None:
+            logger.error(
+                "Error finalizing session for guild %s: %s",
+                guild_id,
+                exc,
+                exc_info=exc,
+            )
 
     def _create_session_for_guild(
         self,
@@ -378,16 +540,20 @@ class PiaPiaBot(discord.Bot):
 
         # Snapshot (best effort) of the player/character mapping at time T
         guild_map = self.player_map.get(guild_id, {})
+        rows = []
         for uid, meta in guild_map.items():
             try:
                 user_id = int(uid)
             except Exception:
                 continue
-            session.add_or_update_player(
-                user_id,
-                player=meta.get("player"),
-                character=meta.get("character"),
+            rows.append(
+                {
+                    "user_id": user_id,
+                    "player": meta.get("player"),
+                    "character": meta.get("character"),
+                }
             )
+        session.add_players_bulk(rows)
 
         return session
 
@@ -402,7 +568,7 @@ class PiaPiaBot(discord.Bot):
         guild_id = ctx.guild_id
 
         helper: Optional[BotHelper] = self.guild_to_helper.get(guild_id)
-        vc = helper.vc if (helper and helper.vc) else ctx.guild.voice_client
+        vc = helper.vc if (helper and helper.vc) else getattr(ctx.guild, "voice_client", None)
         if vc is None:
             raise RuntimeError(
                 f"No VoiceClient available for guild {guild_id}; cannot start the session."
@@ -413,39 +579,30 @@ class PiaPiaBot(discord.Bot):
             gid = ctx_any.guild_id
             logger.debug("%s -> on_stop_record_callback", gid)
 
-            # Cancel the max-duration timer
-            self._cancel_session_timer(gid)
-
-            # Detach state in the loop (thread-safe)
-            sink_obj = self.current_sink_by_guild.pop(gid, None)
+            # Detach state in the loop (timer cancelled too)
+            session_obj, sink_obj = self._detach_session(gid)
 
-            # Finalize + cleanup in a thread (blocking)
-            await asyncio.to_thread(self._finalize_session_meta_for_guild, gid)
-            if sink_obj:
-                await asyncio.to_thread(sink_obj.cleanup)
-
-            # Session ended => remove it
-            self.current_session_by_guild.pop(gid, None)
+            # Finalize + cleanup on the finalize pool (blocking)
+            await self._run_finalize(
+                self._finalize_and_cleanup, gid, session_obj, sink_obj
+            )
 
         audio_archiver: Optional[AudioArchiver] = None
         if force_archive:
-            base_dir = os.path.join(self.settings.logs_dir, self.settings.audio_sessions_subdir)
-            os.makedirs(base_dir, exist_ok=True)
-
             # Discord Voice Receive (py-cord): PCM 48kHz, 16-bit, stereo
             audio_archiver = AudioArchiver(
-                base_dir=base_dir,
+                base_dir=self._audio_sessions_dir,
                 session_id=session.session_id,
                 channels=2,
                 sample_width=2,
                 sample_rate=48000,
-                audio_format=self.settings.audio_format,
+                audio_format=self._audio_format,
             )
             logger.info(
                 "Audio archiving enabled for guild %s, session %s (format: %s).",
                 guild_id,
                 session.session_id,
-                self.settings.audio_format,
+                self._audio_format,
             )
 
         sink = DiscordSink(
@@ -495,7 +652,7 @@ class PiaPiaBot(discord.Bot):
         guild_id = ctx.guild_id
 
         helper = self.guild_to_helper.get(guild_id)
-        vc = helper.vc if (helper and helper.vc) else ctx.guild.voice_client
+        vc = helper.vc if (helper and helper.vc) else getattr(ctx.guild, "voice_client", None)
 
         if vc:
             try:
@@ -517,7 +674,7 @@ class PiaPiaBot(discord.Bot):
         guild_id = ctx.guild_id
 
         helper = self.guild_to_helper.get(guild_id)
-        vc = helper.vc if (helper and helper.vc) else ctx.guild.voice_client
+        vc = helper.vc if (helper and helper.vc) else getattr(ctx.guild, "voice_client", None)
 
         if self.current_sink_by_guild.get(guild_id) is not None:
             self.stop_current_session(ctx)
@@ -544,17 +701,31 @@ class PiaPiaBot(discord.Bot):
     # ------------------------------------------------------------------ #
     async def close(self) -> None:
         """Override: clean up sinks before closing the Discord connection."""
+        # Persist player maps still waiting for their debounced save. The
+        # pending task is cancelled, never awaited: on SIGINT/SIGTERM py-cord
+        # cancels every task, and awaiting it would raise CancelledError here
+        # and skip the whole shutdown.
+        task = self._player_map_flush_task
+        if task is not None and not task.done():
+            task.cancel()
+        self._player_map_flush_task = None
         try:
-            # Copy to avoid mutating the dict during iteration
-            for guild_id, sink in copy(self.current_sink_by_guild).items():
-                # Best effort: finalize the session
-                try:
-                    self._finalize_session_meta_for_guild(guild_id)
-                except Exception as e:
-                    logger.error("Error finalizing meta (guild %s): %s", guild_id, e)
+            await self._flush_player_maps()
+        except Exception as e:
+            logger.error("Error saving player maps during close: %s", e)
 
+        try:
+            # Snapshot to avoid mutating the dict during iteration
+            guild_ids = set(self.current_sink_by_guild) | set(
+                self.current_session_by_guild
+            )
+            for guild_id in guild_ids:
+                session, sink = self._detach_session(guild_id)
+                # Best effort: finalize the session, then stop the sink
                 try:
-                    await asyncio.to_thread(sink.cleanup)
+                    await self._run_finalize(
+                        self._finalize_and_cleanup, guild_id, session, sink
+                    )
                     logger.debug(
                         "DiscordSink stopped for guild %s in close.",
                         guild_id,
@@ -566,6 +737,10 @@ class PiaPiaBot(discord.Bot):
                         e,
                     )
 
+            # Wait for finalizations handed off earlier (force_disconnect...),
+            # without blocking the loop
+            await asyncio.to_thread(self._finalize_executor.shutdown, True)
+
             self.current_sink_by_guild.clear()
             self.current_session_by_guild.clear()
 
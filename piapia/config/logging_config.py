@@ -1,19 +1,96 @@
 # piapia/config/logging_config.py
 
+import atexit
 import logging
 import logging.config
 import logging.handlers
 import os
+import queue
+from typing import List, Optional
 
 from piapia.config.settings import Settings
 
+# Background thread doing the actual console/file writes (see configure_logging)
+_listener: Optional[logging.handlers.QueueListener] = None
+
+# Queued by flush_logging(): tells the listener thread to flush its handlers
+_FLUSH_MARKER = logging.makeLogRecord({"msg": "flush"})
+
+
+class _FlushingQueueListener(logging.handlers.QueueListener):
+    """QueueListener that also flushes its handlers when it meets the marker."""
+
+    def handle(self, record: logging.LogRecord) -> None:
+        if record is _FLUSH_MARKER:
+            for handler in self.handlers:
+                try:
+                    handler.flush()
+                except Exception:
+                    pass
+            return
+        super().handle(record)
+
+
+class BufferedRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    RotatingFileHandler writing through a 64 KiB buffer.
+
+    The stock handler flushes after every record and seeks to the end of the
+    file to decide on rollover (one write() plus one lseek() per line). Here
+    the file size is tracked in memory and records reach the disk when the
+    buffer fills, on rollover, on `flush()` (see `flush_logging`) or
+    immediately for WARNING and above.
+    """
+
+    buffer_size = 1 << 16
+    flush_level = logging.WARNING
+
+    # Current file size in bytes (tracked in memory, compared to maxBytes)
+    _size = 0
+
+    def _open(self):
+        stream = open(
+            self.baseFilename,
+            self.mode,
+            encoding=self.encoding,
+            errors=self.errors,
+            buffering=self.buffer_size,
+        )
+        self._size = stream.tell()
+        return stream
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            msg = self.format(record) + self.terminator
+            if self.stream is None:
+                self.stream = self._open()
+            # maxBytes counts bytes: accented French messages take more than len(msg)
+            size = len(msg.encode(self.encoding or "utf-8", self.errors or "strict"))
+            if self.maxBytes > 0 and self._size + size >= self.maxBytes:
+                self.doRollover()
+                if self.stream is None:
+                    self.stream = self._open()
+
+            self.stream.write(msg)
+            self._size += size
+            if record.levelno >= self.flush_level:
+                self.stream.flush()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
 
 def configure_logging(settings: Settings) -> None:
     """
     Configure application-wide logging from Settings.
 
     - Root logger: console + app file (.logs/app/pia-pia.log)
+    - Loggers only enqueue records; a QueueListener thread formats and writes
+      them, so the event loop and the voice thread never block on log I/O.
     """
+    # Reconfiguring: drain and stop the previous listener before its handlers close
+    stop_logging()
 
     # ------------------------------------------------------------------ #
     # 1) Log directories
@@ -54,7 +131,7 @@ def configure_logging(settings: Settings) -> None:
             },
             # Bot main log: everything through root + libs
             "app_file": {
-                "class": "logging.handlers.RotatingFileHandler",
+                "class": "piapia.config.logging_config.BufferedRotatingFileHandler",
                 "level": level,
                 "formatter": "standard",
                 "filename": app_log_file,
@@ -100,3 +177,51 @@ def configure_logging(settings: Settings) -> None:
     }
 
     logging.config.dictConfig(config)
+
+    # ------------------------------------------------------------------ #
+    # 5) Route every logger through a queue drained by a listener thread
+    # ------------------------------------------------------------------ #
+    _start_queue_listener(list(config["loggers"]))
+
+
+def _start_queue_listener(logger_names: List[str]) -> None:
+    """Swap the console/file handlers for a QueueHandler and start the listener."""
+    global _listener
+    root = logging.getLogger()
+    # All configured loggers share the same console + app_file handlers
+    handlers = list(root.handlers)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+
+    for logger in [root, *(logging.getLogger(name) for name in logger_names)]:
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+        logger.addHandler(queue_handler)
+
+    _listener = _FlushingQueueListener(
+        log_queue, *handlers, respect_handler_level=True
+    )
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def flush_logging() -> None:
+    """
+    Push buffered log lines to disk (e.g. at the end of a session).
+
+    Non-blocking: a marker is queued behind the pending records and the listener
+    thread flushes once it has written them, so the caller never does file I/O.
+    """
+    listener = _listener
+    if listener is None:
+        return
+    listener.queue.put_nowait(_FLUSH_MARKER)
+
+
+def stop_logging() -> None:
+    """Drain pending log records and stop the listener thread (idempotent)."""
+    global _listener
+    listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
@@ -1,5 +1,6 @@
 # piapia/config/settings.py
 
+from functools import lru_cache
 from typing import Optional
 
 from pydantic import Field
@@ -37,4 +38,10 @@ class Settings(BaseSettings):
     audio_format: str = Field("wav", validation_alias="AUDIO_FORMAT")
 
     # Maximum session duration in minutes (0 = unlimited)
-    max_session_duration_minutes: int = Field(240, validation_alias="MAX_SESSION_DURATION_MINUTES")
\ No newline at end of file
+    max_session_duration_minutes: int = Field(240, validation_alias="MAX_SESSION_DURATION_MINUTES")
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Return the process-wide Settings instance (environment parsed once)."""
+    return Settings()
@@ -4,9 +4,12 @@ from __future__ import annotations
 
 import json
 import os
+import sys
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import Any, Dict, Literal, Mapping, Optional
+from typing import Any, Dict, Iterable, List, Literal, Mapping, Optional
+
+from piapia.utils.atomic_write import atomic_write_text
 
 
 SessionMode = Literal["record_only"]
@@ -22,16 +25,30 @@ def _dt_from_iso(value: Optional[str]) -> Optional[datetime]:
     return datetime.fromisoformat(value)
 
 
+def _intern(value: Optional[str]) -> Optional[str]:
+    # Names and modes repeat across sessions: keep a single shared copy
+    return sys.intern(value) if type(value) is str else value
+
+
+def _as_int(value: Any) -> int:
+    # Values loaded from JSON are usually already ints: skip the int() call
+    return value if type(value) is int else int(value)
+
+
 def make_session_id(guild_id: int, now: Optional[datetime] = None) -> str:
     """
     Generate a stable session_id.
     Ex: "2025-12-09_20-30-00_g941688253159968788"
     """
     now = now or datetime.now(timezone.utc)
-    return f"{now.strftime('%Y-%m-%d_%H-%M-%S')}_g{guild_id}"
+    # Plain int formatting: skips strftime's locale-aware C formatter
+    return (
+        f"{now.year:04d}-{now.month:02d}-{now.day:02d}_"
+        f"{now.hour:02d}-{now.minute:02d}-{now.second:02d}_g{guild_id}"
+    )
 
 
-@dataclass
+@dataclass(slots=True)
 class PlayerSessionInfo:
     user_id: int
     player: Optional[str] = None
@@ -43,6 +60,10 @@ class PlayerSessionInfo:
     # Optional if you also want to keep an absolute timestamp
     first_spoke_at: Optional[datetime] = None
 
+    def __post_init__(self) -> None:
+        self.player = _intern(self.player)
+        self.character = _intern(self.character)
+
     def to_dict(self) -> Dict[str, Any]:
         return {
             "user_id": self.user_id,
@@ -55,7 +76,7 @@ class PlayerSessionInfo:
     @classmethod
     def from_dict(cls, data: Mapping[str, Any]) -> "PlayerSessionInfo":
         return cls(
-            user_id=int(data["user_id"]),
+            user_id=_as_int(data["user_id"]),
             player=data.get("player"),
             character=data.get("character"),
             first_offset_seconds=data.get("first_offset_seconds"),
@@ -63,7 +84,30 @@ class PlayerSessionInfo:
         )
 
 
-@dataclass
+def _players_from_dict(
+    raw_players: Mapping[Any, Mapping[str, Any]],
+) -> Dict[int, PlayerSessionInfo]:
+    """Players stored as {"<user_id>": {...}} (current format)."""
+    players: Dict[int, PlayerSessionInfo] = {}
+    for k, v in raw_players.items():
+        try:
+            uid = _as_int(k)
+        except (TypeError, ValueError):
+            uid = _as_int(v.get("user_id"))
+        players[uid] = PlayerSessionInfo.from_dict(v)
+    return players
+
+
+def _players_from_list(raw_players: List[Mapping[str, Any]]) -> Dict[int, PlayerSessionInfo]:
+    """Players stored as [{...}, ...] (legacy format)."""
+    players: Dict[int, PlayerSessionInfo] = {}
+    for item in raw_players:
+        p = PlayerSessionInfo.from_dict(item)
+        players[p.user_id] = p
+    return players
+
+
+@dataclass(slots=True)
 class AudioSessionInfo:
     session_id: str
     guild_id: int
@@ -84,6 +128,9 @@ class AudioSessionInfo:
     #  Allows absorbing additional fields without breaking parsing
     extra: Dict[str, Any] = field(default_factory=dict)
 
+    def __post_init__(self) -> None:
+        self.mode = _intern(self.mode)  # type: ignore[assignment]
+
     def add_or_update_player(
         self,
         user_id: int,
@@ -96,14 +143,24 @@ class AudioSessionInfo:
             self.players[user_id] = info
 
         if player is not None:
-            info.player = player
+            info.player = _intern(player)
         if character is not None:
-            info.character = character
+            info.character = _intern(character)
 
         return info
 
+    def add_players_bulk(self, rows: Iterable[Mapping[str, Any]]) -> None:
+        """
+        Add several players at once (e.g. the player map snapshot).
+        Each row holds PlayerSessionInfo fields; existing entries are replaced.
+        """
+        self.players.update(
+            {row["user_id"]: PlayerSessionInfo(**row) for row in rows}
+        )
+
     def to_dict(self) -> Dict[str, Any]:
         # JSON doesn't like int keys => force to str to be explicit
+        # Always the full player schema: offline tools rely on every key being present
         players_dict = {str(uid): p.to_dict() for uid, p in self.players.items()}
 
         data: Dict[str, Any] = {
@@ -128,20 +185,15 @@ class AudioSessionInfo:
     @classmethod
     def from_dict(cls, data: Mapping[str, Any]) -> "AudioSessionInfo":
         raw_players = data.get("players") or {}
-        players: Dict[int, PlayerSessionInfo] = {}
 
         # Support both dict (str keys) and list formats for players for backward compatibility.
+        players: Dict[int, PlayerSessionInfo]
         if isinstance(raw_players, dict):
-            for k, v in raw_players.items():
-                try:
-                    uid = int(k)
-                except (TypeError, ValueError):
-                    uid = int(v.get("user_id"))
-                players[uid] = PlayerSessionInfo.from_dict(v)
+            players = _players_from_dict(raw_players)
         elif isinstance(raw_players, list):
-            for item in raw_players:
-                p = PlayerSessionInfo.from_dict(item)
-                players[p.user_id] = p
+            players = _players_from_list(raw_players)
+        else:
+            players = {}
 
         return cls(
             session_id=str(data["session_id"]),
@@ -157,6 +209,15 @@ class AudioSessionInfo:
             extra=dict(data.get("extra") or {}),
         )
 
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        """Serialize the session to a JSON string (session_meta.json content)."""
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=indent)
+
+    @classmethod
+    def from_json(cls, raw: "str | bytes") -> "AudioSessionInfo":
+        """Build a session from JSON text (str or UTF-8 bytes)."""
+        return cls.from_dict(json.loads(raw))
+
     def save_json(self, path: Optional[str] = None, indent: int = 2) -> str:
         """
         Save the session as JSON (session_meta.json).
@@ -166,14 +227,19 @@ class AudioSessionInfo:
         if not out_path:
             raise ValueError("No output path (meta_path) defined for this session.")
 
-        os.makedirs(os.path.dirname(out_path), exist_ok=True)
-        with open(out_path, "w", encoding="utf-8") as f:
-            json.dump(self.to_dict(), f, ensure_ascii=False, indent=indent)
+        # Serialize in one go, then a single write (json.dump streams many chunks)
+        payload = self.to_json(indent)
+
+        out_dir = os.path.dirname(out_path)
+        if out_dir:
+            os.makedirs(out_dir, exist_ok=True)
+
+        # Temp file + rename: readers never see a half-written session_meta.json
+        atomic_write_text(out_path, payload)
 
         return out_path
 
     @classmethod
     def load_json(cls, path: str) -> "AudioSessionInfo":
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        return cls.from_dict(data)
+        with open(path, "rb") as f:
+            return cls.from_json(f.read())
@@ -2,11 +2,45 @@
 
 import logging
 import os
-import wave
-from typing import Dict
+import queue
+import struct
+import threading
+from typing import BinaryIO, Dict, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Marker telling the writer thread to stop
+_STOP = object()
+
+# RIFF/WAVE header of a PCM file (44 bytes)
+_WAV_HEADER = struct.Struct("<4sI4s4sIHHIIHH4sI")
+# Offsets of the two size fields inside that header
+_RIFF_SIZE_OFFSET = 4
+_DATA_SIZE_OFFSET = 40
+_U32 = struct.Struct("<I")
+
+
+def build_wav_header(
+    pcm_len: int, channels: int, sample_rate: int, sample_width: int
+) -> bytes:
+    """Return the 44-byte header of a PCM WAV file holding `pcm_len` bytes."""
+    block_align = channels * sample_width
+    return _WAV_HEADER.pack(
+        b"RIFF",
+        36 + pcm_len,
+        b"WAVE",
+        b"fmt ",
+        16,  # fmt chunk size
+        1,  # PCM
+        channels,
+        sample_rate,
+        sample_rate * block_align,
+        block_align,
+        sample_width * 8,
+        b"data",
+        pcm_len,
+    )
+
 
 class AudioArchiver:
     """Per-user audio session archiver.
@@ -19,6 +53,13 @@ class AudioArchiver:
     ------
     - Streaming-friendly: audio is written incrementally to WAV files during the
       session (simple, reliable, and tolerant to interruptions).
+    - Coalesced writes: incoming frames are accumulated per user and written in
+      blocks of about `flush_threshold` bytes (one `write()` per block).
+    - Raw WAV files: PCM is appended after the 44-byte header, whose two size
+      fields are patched after every written block, so a file left behind by a
+      crash still reports the audio written so far.
+    - Background writes: full blocks are handed to a dedicated writer thread
+      through a bounded queue, so disk latency never blocks the audio thread.
     - Best-effort finalization: on `close()`, all WAV files are closed and then
       converted to the requested output format (e.g., mp3, flac, ogg).
     - Safe cleanup: a source WAV is deleted only if its conversion succeeds. If
@@ -50,6 +91,12 @@ class AudioArchiver:
     audio_format:
         Target output format (case-insensitive). Common values include ``"wav"``,
         ``"mp3"``, ``"flac"``, and ``"ogg"``.
+    flush_threshold:
+        Number of pending PCM bytes per user that triggers a disk write. Defaults
+        to about one second of audio at the given format.
+    queue_size:
+        Maximum number of blocks waiting for the writer thread. When the disk
+        cannot keep up, `append` blocks instead of growing memory without bound.
 
     Notes
     -----
@@ -68,6 +115,8 @@ class AudioArchiver:
         sample_width: int,
         sample_rate: int,
         audio_format: str = "wav",
+        flush_threshold: Optional[int] = None,
+        queue_size: int = 256,
     ) -> None:
         self.base_dir = base_dir
         self.session_id = session_id
@@ -79,37 +128,136 @@ class AudioArchiver:
         self.session_path = os.path.join(self.base_dir, self.session_id)
         os.makedirs(self.session_path, exist_ok=True)
 
-        self._files: Dict[int, wave.Wave_write] = {}
+        # Default: ~1 second of audio (e.g. 192 000 bytes for 48 kHz stereo 16-bit)
+        if flush_threshold is None:
+            flush_threshold = channels * sample_width * sample_rate
+        self.flush_threshold = max(1, flush_threshold)
+
+        # Only touched by the writer thread while it runs
+        self._files: Dict[int, BinaryIO] = {}
+        # PCM bytes written to each file (for the WAV header)
+        self._data_sizes: Dict[int, int] = {}
+        # PCM received but not yet handed to the writer, per user
+        self._pending: Dict[int, bytearray] = {}
         self._bytes_written: int = 0
 
+        self._write_queue: "queue.Queue[object]" = queue.Queue(maxsize=queue_size)
+        # Started lazily on the first packet
+        self._writer: Optional[threading.Thread] = None
+
     @property
     def bytes_written(self) -> int:
         """Total number of PCM bytes written since the start of the session."""
         return self._bytes_written
 
-    def _get_or_open_file(self, user_id: int) -> wave.Wave_write:
+    def _wav_header(self, pcm_len: int) -> bytes:
+        return build_wav_header(
+            pcm_len, self.channels, self.sample_rate, self.sample_width
+        )
+
+    def _get_or_open_file(self, user_id: int) -> BinaryIO:
         if user_id in self._files:
             return self._files[user_id]
 
         path = os.path.join(self.session_path, f"user_{user_id}.wav")
-        wf = wave.open(path, "wb")
-        wf.setnchannels(self.channels)
-        wf.setsampwidth(self.sample_width)
-        wf.setframerate(self.sample_rate)
+        f = open(path, "wb")
+        # Empty header; its sizes are patched after every written block
+        f.write(self._wav_header(0))
 
-        self._files[user_id] = wf
-        return wf
+        self._files[user_id] = f
+        self._data_sizes[user_id] = 0
+        return f
 
     def append(self, user_id: int, data: bytes) -> None:
         """
         Append PCM frames for a given user.
 
         Called from the audio processing thread (not in the event loop).
+        Only buffers in memory; disk writes happen on the writer thread.
         """
-        wf = self._get_or_open_file(user_id)
-        wf.writeframes(data)
+        buf = self._pending.get(user_id)
+        if buf is None:
+            buf = self._pending[user_id] = bytearray()
+
+        buf += data
         self._bytes_written += len(data)
 
+        if len(buf) >= self.flush_threshold:
+            self._hand_off(user_id)
+
+    def _hand_off(self, user_id: int) -> None:
+        """Pass a user's pending block to the writer thread."""
+        buf = self._pending.pop(user_id, None)
+        if not buf:
+            return
+        if self._writer is None:
+            self._writer = threading.Thread(
+                target=self._drain,
+                name=f"archiver-{self.session_id}",
+                daemon=True,
+            )
+            self._writer.start()
+        self._write_queue.put((user_id, buf))
+
+    @staticmethod
+    def _patch_sizes(f: BinaryIO, data_size: int) -> None:
+        """Update the RIFF and data sizes in place, then flush to the OS."""
+        end = f.tell()
+        f.seek(_RIFF_SIZE_OFFSET)
+        f.write(_U32.pack(36 + data_size))
+        f.seek(_DATA_SIZE_OFFSET)
+        f.write(_U32.pack(data_size))
+        f.seek(end)
+        f.flush()
+
+    def _drain(self) -> None:
+        """Writer thread: write queued blocks until the stop marker."""
+        while True:
+            batch: List[Tuple[int, bytearray]] = []
+            item = self._write_queue.get()
+            stop = item is _STOP
+            if not stop:
+                batch.append(item)  # type: ignore[arg-type]
+                # Take whatever else is already waiting
+                while True:
+                    try:
+                        item = self._write_queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is _STOP:
+                        stop = True
+                        break
+                    batch.append(item)  # type: ignore[arg-type]
+
+            # One write per user and per batch (order kept per user)
+            grouped: Dict[int, List[bytearray]] = {}
+            for user_id, block in batch:
+                grouped.setdefault(user_id, []).append(block)
+
+            for user_id, blocks in grouped.items():
+                try:
+                    f = self._get_or_open_file(user_id)
+                    data = blocks[0] if len(blocks) == 1 else b"".join(blocks)
+                    f.write(data)
+                    self._data_sizes[user_id] += len(data)
+                    self._patch_sizes(f, self._data_sizes[user_id])
+                except Exception as e:
+                    logger.error("Error writing audio for user %s: %s", user_id, e)
+
+            if stop:
+                return
+
+    def _stop_writer(self) -> None:
+        """Hand off every pending block and wait for the writer to finish."""
+        for user_id in list(self._pending):
+            self._hand_off(user_id)
+
+        if self._writer is None:
+            return
+        self._write_queue.put(_STOP)
+        self._writer.join()
+        self._writer = None
+
     def _convert_to_target_format(self) -> None:
         """Convert all WAV files in the session to the target format via pydub."""
         if self.audio_format == "wav":
@@ -152,16 +300,25 @@ class AudioArchiver:
 
     def close(self) -> None:
         """Close all open WAV files, then convert to the target format."""
+        # 1) Let the writer thread write everything still pending
+        self._stop_writer()
+
         if not self._files:
             return
-         
-        # 1) Close all WAVs
-        for wf in self._files.values():
+
+        for user_id, f in self._files.items():
             try:
-                wf.close()
-            except Exception:
-                pass
+                f.seek(0)
+                f.write(self._wav_header(self._data_sizes.get(user_id, 0)))
+            except Exception as e:
+                logger.error("Error writing WAV header for user %s: %s", user_id, e)
+            finally:
+                try:
+                    f.close()
+                except Exception:
+                    pass
         self._files.clear()
+        self._data_sizes.clear()
 
         # 2) Conversion (best effort)
         try:
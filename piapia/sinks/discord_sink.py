@@ -2,7 +2,6 @@
 
 from __future__ import annotations
 
-import os
 import json
 import logging
 import threading
@@ -13,6 +12,7 @@ from discord.sinks.core import Filters, Sink, default_filters
 
 from piapia.config.settings import Settings
 from piapia.sinks.audio_archiver import AudioArchiver
+from piapia.utils.atomic_write import atomic_write_text
 
 logger = logging.getLogger(__name__)
 
@@ -144,8 +144,10 @@ class DiscordSink(Sink):
 
         extras: Dict[str, Any] = {
             "audio_start_ts": self.start_ts,
+            # Millisecond precision is plenty for aligning tracks (and keeps JSON short)
             "user_first_offset_seconds": {
-                str(uid): off for uid, off in self.user_first_offset_seconds.items()
+                str(uid): round(off, 3)
+                for uid, off in self.user_first_offset_seconds.items()
             },
         }
 
@@ -171,10 +173,13 @@ class DiscordSink(Sink):
         cur_extra.update({k: v for k, v in extras.items() if v is not None})
         data["extra"] = cur_extra
 
+        # The session directory was created with the session (apply_paths_to_session).
+        # Same atomic write as AudioSessionInfo.save_json: never a truncated meta file.
         try:
-            os.makedirs(os.path.dirname(self.session_meta_path), exist_ok=True)
-            with open(self.session_meta_path, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            atomic_write_text(
+                self.session_meta_path,
+                json.dumps(data, ensure_ascii=False, indent=2),
+            )
         except Exception as e:
             logger.error("Error writing session meta extras: %s", e)
 
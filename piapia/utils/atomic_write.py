@@ -0,0 +1,58 @@
+# piapia/utils/atomic_write.py
+
+from __future__ import annotations
+
+import os
+import stat
+import tempfile
+from typing import Union
+
+PathLike = Union[str, "os.PathLike[str]"]
+
+
+def _current_umask() -> int:
+    # There is no read-only accessor: set and restore right away
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+# Read once at import time (os.umask is process-wide and not thread-safe)
+_UMASK = _current_umask()
+
+
+def atomic_write_text(path: PathLike, text: str, encoding: str = "utf-8") -> None:
+    """
+    Write `text` to `path` atomically.
+
+    The content goes to a temp file next to the target, is fsynced, then renamed
+    over `path`: readers never see a truncated file, even after a crash.
+    The final file keeps the mode of the file it replaces, or gets the usual
+    permissions of a new file (0666 minus umask) instead of mkstemp's 0600.
+    """
+    path = os.fspath(path)
+    directory = os.path.dirname(path) or "."
+
+    try:
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        mode = 0o666 & ~_UMASK
+
+    fd, tmp_name = tempfile.mkstemp(
+        dir=directory,
+        prefix=f".{os.path.basename(path)}.",
+        suffix=".tmp",
+    )
+    try:
+        with os.fdopen(fd, "w", encoding=encoding) as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_name, mode)
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
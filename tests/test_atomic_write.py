@@ -0,0 +1,58 @@
+# tests/test_atomic_write.py
+
+"""Tests pour piapia/utils/atomic_write.py"""
+
+import os
+import stat
+import sys
+
+import pytest
+
+from piapia.utils.atomic_write import _UMASK, atomic_write_text
+
+
+def _mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+# =============================================================================
+# atomic_write_text
+# =============================================================================
+class TestAtomicWriteText:
+    def test_writes_content(self, tmp_path):
+        """Le contenu est écrit tel quel (UTF-8)."""
+        target = tmp_path / "map.json"
+
+        atomic_write_text(target, '{"nom": "Élodie"}')
+
+        assert target.read_text(encoding="utf-8") == '{"nom": "Élodie"}'
+
+    def test_replaces_without_leftovers(self, tmp_path):
+        """Un fichier existant est remplacé, sans fichier temporaire résiduel."""
+        target = tmp_path / "map.json"
+        target.write_text("ancien", encoding="utf-8")
+
+        atomic_write_text(target, "nouveau")
+
+        assert target.read_text(encoding="utf-8") == "nouveau"
+        assert [p.name for p in tmp_path.iterdir()] == ["map.json"]
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="permissions POSIX")
+    def test_new_file_uses_umask_not_0600(self, tmp_path):
+        """Un nouveau fichier a les permissions usuelles (0666 moins umask)."""
+        target = tmp_path / "map.json"
+
+        atomic_write_text(target, "{}")
+
+        assert _mode(target) == 0o666 & ~_UMASK
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="permissions POSIX")
+    def test_keeps_existing_mode(self, tmp_path):
+        """Le fichier remplacé garde ses permissions."""
+        target = tmp_path / "map.json"
+        target.write_text("{}", encoding="utf-8")
+        os.chmod(target, 0o640)
+
+        atomic_write_text(target, "[]")
+
+        assert _mode(target) == 0o640
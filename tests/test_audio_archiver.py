@@ -2,12 +2,14 @@
 
 """Tests pour piapia/sinks/audio_archiver.py"""
 
+import io
+import time
 import wave
 from pathlib import Path
 
 import pytest
 
-from piapia.sinks.audio_archiver import AudioArchiver
+from piapia.sinks.audio_archiver import AudioArchiver, build_wav_header
 
 
 @pytest.fixture
@@ -116,6 +118,97 @@ class TestArchiverAppend:
         assert (tmp_path / "test-session" / "user_100.wav").exists()
         assert (tmp_path / "test-session" / "user_200.wav").exists()
 
+    def test_default_flush_threshold_is_one_second(self, archiver):
+        """Le seuil par défaut correspond à ~1 seconde d'audio."""
+        assert archiver.flush_threshold == 48000 * 2 * 2
+
+    def test_flushed_and_pending_frames_all_written(self, tmp_path):
+        """Les blocs écrits au seuil et le reliquat en attente sont tous conservés."""
+        archiver = AudioArchiver(
+            base_dir=str(tmp_path),
+            session_id="coalesce",
+            channels=2,
+            sample_width=2,
+            sample_rate=48000,
+            flush_threshold=4 * 3840,
+        )
+        frame = b"\x01\x00" * 1920  # 20 ms stéréo 48kHz 16-bit
+        for _ in range(10):  # 2 blocs au seuil + 2 trames en attente
+            archiver.append(user_id=1, data=frame)
+        archiver.close()
+
+        with wave.open(str(tmp_path / "coalesce" / "user_1.wav"), "rb") as wf:
+            assert wf.getnframes() == 10 * 960
+            assert wf.readframes(960) == frame
+
+    def test_pending_frames_written_on_close(self, tmp_path):
+        """Les trames sous le seuil sont écrites à la fermeture."""
+        archiver = AudioArchiver(
+            base_dir=str(tmp_path),
+            session_id="pending",
+            channels=2,
+            sample_width=2,
+            sample_rate=48000,
+        )
+        frame = b"\x00" * 3840
+        for _ in range(5):
+            archiver.append(user_id=7, data=frame)
+        archiver.close()
+
+        with wave.open(str(tmp_path / "pending" / "user_7.wav"), "rb") as wf:
+            assert wf.getnframes() == 5 * 960
+
+    def test_background_writer_keeps_order_per_user(self, tmp_path):
+        """Le thread d'écriture conserve l'ordre des trames de chaque utilisateur."""
+        archiver = AudioArchiver(
+            base_dir=str(tmp_path),
+            session_id="writer",
+            channels=1,
+            sample_width=2,
+            sample_rate=48000,
+            flush_threshold=4,
+            queue_size=2,
+        )
+        for i in range(50):
+            archiver.append(user_id=1, data=bytes([i, i]) * 2)
+            archiver.append(user_id=2, data=bytes([100 + i, 0]) * 2)
+        archiver.close()
+
+        with wave.open(str(tmp_path / "writer" / "user_1.wav"), "rb") as wf:
+            data_1 = wf.readframes(wf.getnframes())
+        with wave.open(str(tmp_path / "writer" / "user_2.wav"), "rb") as wf:
+            data_2 = wf.readframes(wf.getnframes())
+
+        assert data_1 == b"".join(bytes([i, i]) * 2 for i in range(50))
+        assert data_2 == b"".join(bytes([100 + i, 0]) * 2 for i in range(50))
+
+    def test_header_up_to_date_before_close(self, tmp_path):
+        """Sans close (crash), l'en-tête WAV reflète déjà l'audio écrit."""
+        archiver = AudioArchiver(
+            base_dir=str(tmp_path),
+            session_id="crash",
+            channels=2,
+            sample_width=2,
+            sample_rate=48000,
+        )
+        second = b"\x00" * archiver.flush_threshold
+        for _ in range(4):
+            archiver.append(user_id=1, data=second)
+
+        wav_path = tmp_path / "crash" / "user_1.wav"
+        deadline = time.monotonic() + 5
+        nframes = 0
+        while time.monotonic() < deadline:
+            if wav_path.exists() and wav_path.stat().st_size >= 44 + 4 * len(second):
+                with wave.open(str(wav_path), "rb") as wf:
+                    nframes = wf.getnframes()
+                if nframes == 4 * 48000:
+                    break
+            time.sleep(0.01)
+
+        assert nframes == 4 * 48000
+        archiver.close()
+
 
 # =============================================================================
 # close
@@ -247,4 +340,25 @@ class TestArchiverAudioParams:
         
         wav_path = tmp_path / "44k-session" / "user_1.wav"
         with wave.open(str(wav_path), "rb") as wf:
-            assert wf.getframerate() == 44100
\ No newline at end of file
+            assert wf.getframerate() == 44100
+
+
+# =============================================================================
+# build_wav_header
+# =============================================================================
+class TestBuildWavHeader:
+    def test_header_is_44_bytes(self):
+        """L'en-tête WAV fait 44 octets."""
+        assert len(build_wav_header(0, 2, 48000, 2)) == 44
+
+    def test_header_readable_by_wave(self):
+        """Un en-tête suivi du PCM est lisible par le module wave."""
+        pcm = b"\x01\x00" * 480
+        buf = io.BytesIO(build_wav_header(len(pcm), 1, 48000, 2) + pcm)
+
+        with wave.open(buf, "rb") as wf:
+            assert wf.getnchannels() == 1
+            assert wf.getsampwidth() == 2
+            assert wf.getframerate() == 48000
+            assert wf.getnframes() == 480
+            assert wf.readframes(480) == pcm
@@ -0,0 +1,152 @@
+# tests/test_logging_config.py
+
+"""Tests pour piapia/config/logging_config.py"""
+
+import logging
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from piapia.config.logging_config import (
+    BufferedRotatingFileHandler,
+    configure_logging,
+    flush_logging,
+    stop_logging,
+)
+
+
+def _record(msg, level=logging.INFO):
+    return logging.makeLogRecord({"msg": msg, "levelno": level, "levelname": logging.getLevelName(level)})
+
+
+@pytest.fixture
+def log_path(tmp_path):
+    return tmp_path / "app.log"
+
+
+# =============================================================================
+# BufferedRotatingFileHandler
+# =============================================================================
+class TestBufferedRotatingFileHandler:
+    def test_info_is_buffered_until_flush(self, log_path):
+        """Les INFO restent en mémoire jusqu'au flush."""
+        handler = BufferedRotatingFileHandler(str(log_path), encoding="utf-8")
+        try:
+            handler.emit(_record("ligne info"))
+            assert log_path.read_text(encoding="utf-8") == ""
+
+            handler.flush()
+            assert log_path.read_text(encoding="utf-8") == "ligne info\n"
+        finally:
+            handler.close()
+
+    def test_warning_is_written_immediately(self, log_path):
+        """Les WARNING (et plus) sont écrits tout de suite."""
+        handler = BufferedRotatingFileHandler(str(log_path), encoding="utf-8")
+        try:
+            handler.emit(_record("ligne info"))
+            handler.emit(_record("attention", logging.WARNING))
+
+            assert log_path.read_text(encoding="utf-8") == "ligne info\nattention\n"
+        finally:
+            handler.close()
+
+    def test_rollover_keeps_every_line(self, log_path):
+        """La rotation se déclenche sur la taille suivie en mémoire, sans perte de lignes."""
+        handler = BufferedRotatingFileHandler(
+            str(log_path), maxBytes=100, backupCount=10, encoding="utf-8"
+        )
+        lines = [f"ligne {i:03d} " + "x" * 20 for i in range(20)]  # 30 octets chacune
+        try:
+            for line in lines:
+                handler.emit(_record(line))
+        finally:
+            handler.close()
+
+        # Du plus ancien (.N) au plus récent (app.log)
+        backups = sorted(
+            log_path.parent.glob("app.log.*"),
+            key=lambda f: int(f.suffix[1:]),
+            reverse=True,
+        )
+        files = backups + [log_path]
+        assert len(files) > 1
+        for f in files:
+            assert f.stat().st_size < 100
+
+        written = "".join(f.read_text(encoding="utf-8") for f in files).splitlines()
+        assert written == lines
+
+    def test_rollover_counts_bytes_not_characters(self, log_path):
+        """La taille suivie compte les octets UTF-8 : les fichiers restent sous maxBytes."""
+        handler = BufferedRotatingFileHandler(
+            str(log_path), maxBytes=100, backupCount=10, encoding="utf-8"
+        )
+        lines = [f"séance {i:02d} " + "é" * 12 for i in range(10)]  # 23 caractères, 35 octets
+        try:
+            for line in lines:
+                handler.emit(_record(line))
+        finally:
+            handler.close()
+
+        files = [log_path] + list(log_path.parent.glob("app.log.*"))
+        for f in files:
+            assert f.stat().st_size < 100
+
+    def test_reopen_counts_existing_file_size(self, log_path):
+        """À la réouverture, la taille existante du fichier compte pour la rotation."""
+        log_path.write_text("a" * 80 + "\n", encoding="utf-8")
+
+        handler = BufferedRotatingFileHandler(
+            str(log_path), maxBytes=100, backupCount=1, encoding="utf-8"
+        )
+        try:
+            handler.emit(_record("b" * 30))
+        finally:
+            handler.close()
+
+        assert (log_path.parent / "app.log.1").read_text(encoding="utf-8") == "a" * 80 + "\n"
+        assert log_path.read_text(encoding="utf-8") == "b" * 30 + "\n"
+
+
+# =============================================================================
+# flush_logging
+# =============================================================================
+class TestFlushLogging:
+    @pytest.fixture
+    def configured(self, tmp_path):
+        """configure_logging dans un dossier temporaire, état global restauré ensuite."""
+        names = ["", "discord", "asyncio", "httpx", "httpcore", "py.warnings"]
+        saved = {n: (list(logging.getLogger(n).handlers), logging.getLogger(n).level) for n in names}
+
+        settings = MagicMock()
+        settings.logs_dir = str(tmp_path)
+        settings.debug = False
+        configure_logging(settings)
+        yield tmp_path / "app" / "pia-pia.log"
+
+        stop_logging()
+        for n, (handlers, level) in saved.items():
+            logger = logging.getLogger(n)
+            for h in list(logger.handlers):
+                logger.removeHandler(h)
+                h.close()
+            for h in handlers:
+                logger.addHandler(h)
+            logger.setLevel(level)
+
+    def test_flush_writes_queued_records(self, configured):
+        """flush_logging fait écrire par le thread d'écoute les lignes déjà en file."""
+        logging.getLogger("piapia.test").info("fin de session")
+        flush_logging()
+
+        deadline = time.monotonic() + 5
+        content = ""
+        while time.monotonic() < deadline:
+            content = configured.read_text(encoding="utf-8")
+            if "fin de session" in content:
+                break
+            time.sleep(0.01)
+
+        assert "fin de session" in content
@@ -0,0 +1,241 @@
+# tests/test_piapia_bot.py
+
+"""Tests pour piapia/bot/piapia_bot.py"""
+
+import asyncio
+import json
+import logging
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+from piapia.bot.piapia_bot import PiaPiaBot, _dump_player_map
+
+
+@pytest.fixture
+def mock_settings(tmp_path):
+    """Settings mocké pointant vers un dossier temporaire."""
+    settings = MagicMock()
+    settings.audio_format = "wav"
+    settings.player_map_dir = str(tmp_path / "player_maps")
+    settings.logs_dir = str(tmp_path / "logs")
+    settings.audio_sessions_subdir = "audio"
+    settings.max_session_duration_minutes = 0
+    return settings
+
+
+# =============================================================================
+# close
+# =============================================================================
+class TestBotClose:
+    @pytest.mark.asyncio
+    async def test_close_survives_cancelled_player_map_flush(self, mock_settings, tmp_path):
+        """Un flush différé annulé (SIGTERM) n'empêche ni le nettoyage ni la sauvegarde."""
+        bot = PiaPiaBot(mock_settings)
+
+        bot.player_map[1] = {10: {"player": "Alice", "character": "Mage"}}
+        bot._player_map_dirty.add(1)
+        task = asyncio.create_task(bot._delayed_player_map_flush(60))
+        bot._player_map_flush_task = task
+
+        sink = MagicMock()
+        bot.current_sink_by_guild[1] = sink
+
+        # Comme py-cord à l'arrêt : toutes les tâches sont annulées
+        asyncio.get_running_loop().call_soon(task.cancel)
+        await bot.close()
+
+        sink.cleanup.assert_called_once()
+        assert bot.current_sink_by_guild == {}
+        saved = json.loads((tmp_path / "player_maps" / "guild_1.json").read_text("utf-8"))
+        assert saved == {"10": {"player": "Alice", "character": "Mage"}}
+
+    @pytest.mark.asyncio
+    async def test_close_waits_for_pending_finalizations(self, mock_settings):
+        """close attend les finalisations en cours puis arrête le pool."""
+        bot = PiaPiaBot(mock_settings)
+        release = threading.Event()
+        sink = MagicMock()
+        sink.cleanup.side_effect = lambda: release.wait(5)
+        bot.current_sink_by_guild[1] = sink
+
+        bot._close_and_clean_sink_for_guild(1)
+        asyncio.get_running_loop().call_later(0.05, release.set)
+        await bot.close()
+
+        sink.cleanup.assert_called_once()
+        with pytest.raises(RuntimeError):
+            bot._finalize_executor.submit(print)
+
+
+# =============================================================================
+# _close_and_clean_sink_for_guild
+# =============================================================================
+class TestCloseAndCleanSink:
+    @pytest.mark.asyncio
+    async def test_cleanup_runs_on_finalize_pool(self, mock_settings):
+        """La conversion (sink.cleanup) ne tourne pas sur la boucle asyncio."""
+        bot = PiaPiaBot(mock_settings)
+        done = threading.Event()
+        threads = []
+
+        def cleanup():
+            threads.append(threading.current_thread().name)
+            done.set()
+
+        sink = MagicMock()
+        sink.cleanup.side_effect = cleanup
+        session = MagicMock()
+        session.ended_at = None
+        bot.current_sink_by_guild[1] = sink
+        bot.current_session_by_guild[1] = session
+
+        bot._close_and_clean_sink_for_guild(1)
+
+        # L'état est détaché immédiatement
+        assert bot.current_sink_by_guild == {}
+        assert bot.current_session_by_guild == {}
+
+        assert done.wait(5)
+        assert threads[0].startswith("finalize")
+        session.save_json.assert_called_once()
+        assert session.ended_at is not None
+        bot._finalize_executor.shutdown(wait=True)
+
+    @pytest.mark.asyncio
+    async def test_background_error_is_logged(self, mock_settings, caplog):
+        """Une erreur de finalisation en arrière-plan est journalisée, pas perdue."""
+        bot = PiaPiaBot(mock_settings)
+        bot._finalize_and_cleanup = MagicMock(side_effect=ValueError("boom"))
+        bot.current_sink_by_guild[1] = MagicMock()
+
+        with caplog.at_level(logging.ERROR, logger="piapia"):
+            bot._close_and_clean_sink_for_guild(1)
+            bot._finalize_executor.shutdown(wait=True)
+
+        errors = [r for r in caplog.records if r.levelno == logging.ERROR]
+        assert len(errors) == 1
+        assert "guild 1" in errors[0].getMessage()
+        assert isinstance(errors[0].exc_info[1], ValueError)
+
+
+# =============================================================================
+# Player maps (JSON + ancien YAML)
+# =============================================================================
+class TestPlayerMapFiles:
+    @pytest.fixture
+    def map_dir(self, tmp_path):
+        path = tmp_path / "player_maps"
+        path.mkdir()
+        return path
+
+    @pytest.mark.asyncio
+    async def test_json_roundtrip_restores_int_keys(self, mock_settings, map_dir):
+        """Les clés str du JSON redeviennent des user_id int au chargement."""
+        _dump_player_map(
+            map_dir / "guild_1.json",
+            {10: {"player": "Élodie", "character": "Mage"}},
+        )
+
+        bot = PiaPiaBot(mock_settings)
+
+        assert bot.player_map == {1: {10: {"player": "Élodie", "character": "Mage"}}}
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("suffix", [".yaml", ".yml"])
+    async def test_legacy_yaml_loaded_without_json(self, mock_settings, map_dir, suffix):
+        """Un ancien guild_<id>.yaml/.yml est lu s'il n'y a pas de JSON."""
+        (map_dir / f"guild_2{suffix}").write_text(
+            "20:\n  player: Bob\n  character: Voleur\n", encoding="utf-8"
+        )
+
+        bot = PiaPiaBot(mock_settings)
+
+        assert bot.player_map == {2: {20: {"player": "Bob", "character": "Voleur"}}}
+
+    @pytest.mark.asyncio
+    async def test_json_wins_over_stale_yaml(self, mock_settings, map_dir):
+        """Pour une même guilde, le JSON l'emporte sur un YAML périmé."""
+        _dump_player_map(map_dir / "guild_3.json", {30: {"player": "Neuf", "character": "A"}})
+        (map_dir / "guild_3.yaml").write_text(
+            "30:\n  player: Ancien\n  character: B\n", encoding="utf-8"
+        )
+
+        bot = PiaPiaBot(mock_settings)
+
+        assert bot.player_map == {3: {30: {"player": "Neuf", "character": "A"}}}
+
+    @pytest.mark.asyncio
+    async def test_invalid_filenames_are_skipped(self, mock_settings, map_dir):
+        """Les fichiers au nom invalide ou hors format sont ignorés."""
+        entry = {"40": {"player": "X", "character": "Y"}}
+        for name in ["guild_abc.json", "guild_.yaml", "other_4.json", "guild_4.txt"]:
+            (map_dir / name).write_text(json.dumps(entry), encoding="utf-8")
+
+        bot = PiaPiaBot(mock_settings)
+
+        assert bot.player_map == {}
+
+
+# =============================================================================
+# Sauvegarde différée des player maps
+# =============================================================================
+class TestPlayerMapDebounce:
+    @staticmethod
+    def _ctx(guild_id, *names):
+        ctx = MagicMock()
+        ctx.guild_id = guild_id
+        ctx.guild.members = [
+            MagicMock(id=i, display_name=f"perso {n}") for i, n in enumerate(names)
+        ]
+        for member, n in zip(ctx.guild.members, names):
+            member.name = n
+        return ctx
+
+    @pytest.mark.asyncio
+    async def test_updates_in_window_write_once_per_guild(self, mock_settings, monkeypatch):
+        """Plusieurs mises à jour dans la fenêtre => une seule écriture par guilde."""
+        dump = MagicMock()
+        monkeypatch.setattr("piapia.bot.piapia_bot._dump_player_map", dump)
+        monkeypatch.setattr(PiaPiaBot, "PLAYER_MAP_FLUSH_DELAY", 0.01)
+        bot = PiaPiaBot(mock_settings)
+
+        await bot.update_player_map(self._ctx(1, "Alice"))
+        await bot.update_player_map(self._ctx(1, "Alice", "Bob"))
+        await bot.update_player_map(self._ctx(2, "Carol"))
+        await bot.update_player_map(self._ctx(1, "Alice", "Bob", "Dan"))
+        await bot._player_map_flush_task
+
+        written = {path.name: data for (path, data), _ in dump.call_args_list}
+        assert dump.call_count == 2
+        assert set(written) == {"guild_1.json", "guild_2.json"}
+        assert len(written["guild_1.json"]) == 3
+        assert bot._player_map_dirty == set()
+
+    @pytest.mark.asyncio
+    async def test_cancelled_flush_keeps_guild_dirty(self, mock_settings, monkeypatch):
+        """Un flush annulé en pleine écriture remet la guilde dans les maps à sauver."""
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_dump(path, data):
+            started.set()
+            release.wait(5)
+
+        monkeypatch.setattr("piapia.bot.piapia_bot._dump_player_map", slow_dump)
+        bot = PiaPiaBot(mock_settings)
+        bot.player_map[1] = {10: {"player": "Alice", "character": "Mage"}}
+        bot._player_map_dirty.add(1)
+
+        task = asyncio.create_task(bot._flush_player_maps())
+        while not started.is_set():
+            await asyncio.sleep(0.01)
+        task.cancel()
+        try:
+            with pytest.raises(asyncio.CancelledError):
+                await task
+        finally:
+            release.set()
+
+        assert bot._player_map_dirty == {1}
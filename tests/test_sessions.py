@@ -3,6 +3,8 @@
 """Tests pour piapia/domain/sessions.py"""
 
 import json
+import stat
+import sys
 from datetime import datetime, timezone
 
 import pytest
@@ -12,6 +14,12 @@ from piapia.domain.sessions import (
     PlayerSessionInfo,
     make_session_id,
 )
+from piapia.utils.atomic_write import _UMASK
+
+# Dates de référence (datetime est immuable : partageables entre les tests)
+_DT_MINIMAL_START = datetime(2025, 1, 1, 0, 0, 0)
+_DT_FULL_START = datetime(2025, 6, 15, 14, 30, 0)
+_DT_FULL_END = datetime(2025, 6, 15, 16, 0, 0)
 
 
 # =============================================================================
@@ -72,7 +80,7 @@ class TestPlayerSessionInfo:
 
     def test_to_dict_full(self):
         """Sérialisation avec tous les champs."""
-        dt = datetime(2025, 6, 15, 14, 30, 0)
+        dt = _DT_FULL_START
         player = PlayerSessionInfo(
             user_id=12345,
             player="Jean",
@@ -89,6 +97,13 @@ class TestPlayerSessionInfo:
         assert data["first_offset_seconds"] == 42.5
         assert data["first_spoke_at"] == dt.isoformat()
 
+    def test_names_are_interned(self):
+        """Les noms identiques partagent la même chaîne en mémoire."""
+        a = PlayerSessionInfo(user_id=1, character="".join(["Gan", "dalf"]))
+        b = PlayerSessionInfo.from_dict({"user_id": 2, "character": "".join(["Gand", "alf"])})
+
+        assert a.character is b.character
+
     def test_from_dict_minimal(self):
         """Désérialisation avec seulement user_id."""
         data = {"user_id": 99999}
@@ -115,7 +130,7 @@ class TestPlayerSessionInfo:
         assert player.player == "Marie"
         assert player.character == "Elara"
         assert player.first_offset_seconds == 10.0
-        assert player.first_spoke_at == datetime(2025, 6, 15, 14, 30, 0)
+        assert player.first_spoke_at == _DT_FULL_START
 
     def test_roundtrip(self):
         """to_dict puis from_dict conserve les données."""
@@ -124,7 +139,7 @@ class TestPlayerSessionInfo:
             player="Test",
             character="Hero",
             first_offset_seconds=5.5,
-            first_spoke_at=datetime(2025, 1, 1, 0, 0, 0),
+            first_spoke_at=_DT_MINIMAL_START,
         )
         
         data = original.to_dict()
@@ -148,7 +163,7 @@ class TestAudioSessionInfo:
             session_id="2025-01-01_00-00-00_g111",
             guild_id=111,
             mode="record_only",
-            started_at=datetime(2025, 1, 1, 0, 0, 0),
+            started_at=_DT_MINIMAL_START,
         )
 
     @pytest.fixture
@@ -158,15 +173,17 @@ class TestAudioSessionInfo:
             session_id="2025-06-15_14-30-00_g222",
             guild_id=222,
             mode="record_only",
-            started_at=datetime(2025, 6, 15, 14, 30, 0),
-            ended_at=datetime(2025, 6, 15, 16, 0, 0),
+            started_at=_DT_FULL_START,
+            ended_at=_DT_FULL_END,
             label="Session de test",
             base_dir="/tmp/audio/session1",
             audio_dir="/tmp/audio/session1",
             meta_path="/tmp/audio/session1/session_meta.json",
         )
-        session.add_or_update_player(1001, player="Alice", character="Mage")
-        session.add_or_update_player(1002, player="Bob", character="Warrior")
+        session.add_players_bulk([
+            {"user_id": 1001, "player": "Alice", "character": "Mage"},
+            {"user_id": 1002, "player": "Bob", "character": "Warrior"},
+        ])
         session.extra = {"custom_field": "value"}
         return session
 
@@ -192,6 +209,20 @@ class TestAudioSessionInfo:
         assert data["players"]["1001"]["player"] == "Alice"
         assert data["extra"]["custom_field"] == "value"
 
+    def test_to_dict_players_keep_full_schema(self, minimal_session):
+        """Les joueurs gardent toutes leurs clés, même à None (schéma de session_meta.json)."""
+        minimal_session.add_or_update_player(7)
+
+        player = minimal_session.to_dict()["players"]["7"]
+
+        assert set(player) == {
+            "user_id",
+            "player",
+            "character",
+            "first_offset_seconds",
+            "first_spoke_at",
+        }
+
     def test_from_dict_minimal(self):
         """Désérialisation d'une session minimale."""
         data = {
@@ -290,6 +321,29 @@ class TestAudioSessionInfo:
         assert minimal_session.players[999].player == "First"  # inchangé
         assert minimal_session.players[999].character == "Updated"
 
+    def test_add_players_bulk(self, minimal_session):
+        """add_players_bulk ajoute plusieurs joueurs en une fois."""
+        minimal_session.add_players_bulk([
+            {"user_id": 1, "player": "A", "character": "Elfe"},
+            {"user_id": 2, "player": "B"},
+        ])
+
+        assert set(minimal_session.players) == {1, 2}
+        assert minimal_session.players[1].character == "Elfe"
+        assert minimal_session.players[2].player == "B"
+        assert minimal_session.players[2].character is None
+
+    @pytest.mark.parametrize("as_bytes", [False, True])
+    def test_to_json_from_json_roundtrip(self, full_session, as_bytes):
+        """to_json puis from_json conserve les données, sans passer par le disque."""
+        raw = full_session.to_json()
+        if as_bytes:
+            raw = raw.encode("utf-8")
+
+        loaded = AudioSessionInfo.from_json(raw)
+
+        assert loaded.to_dict() == full_session.to_dict()
+
     def test_save_and_load_json(self, full_session, tmp_path):
         """save_json puis load_json conserve les données."""
         json_path = tmp_path / "session_meta.json"
@@ -318,6 +372,27 @@ class TestAudioSessionInfo:
         with pytest.raises(ValueError, match="Aucun chemin"):
             minimal_session.save_json()
 
+    def test_save_json_overwrites_without_leftovers(self, minimal_session, tmp_path):
+        """save_json remplace le fichier existant sans laisser de fichier temporaire."""
+        json_path = tmp_path / "session_meta.json"
+        json_path.write_text("ancien contenu", encoding="utf-8")
+        minimal_session.meta_path = str(json_path)
+
+        minimal_session.save_json()
+
+        assert json.loads(json_path.read_text(encoding="utf-8"))["guild_id"] == 111
+        assert [p.name for p in tmp_path.iterdir()] == ["session_meta.json"]
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="permissions POSIX")
+    def test_save_json_file_is_not_private(self, minimal_session, tmp_path):
+        """session_meta.json reste lisible comme un fichier normal (pas 0600)."""
+        json_path = tmp_path / "session_meta.json"
+        minimal_session.meta_path = str(json_path)
+
+        minimal_session.save_json()
+
+        assert stat.S_IMODE(json_path.stat().st_mode) == 0o666 & ~_UMASK
+
     def test_save_json_custom_path(self, minimal_session, tmp_path):
         """save_json avec chemin explicite utilise ce chemin."""
         custom_path = tmp_path / "custom.json"